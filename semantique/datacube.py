@@ -137,6 +137,15 @@ class Opendatacube(Datacube):
             "discrete": "nearest"
           }
 
+      * **dask_chunks** (:obj:`dict`): Should the data be loaded lazily as
+        dask-backed arrays, and if so, with what chunk sizes? Should be
+        specified as a dictionary mapping dimension names to chunk sizes,
+        e.g. ``{"time": 1, "x": 1024, "y": 1024}``, and is forwarded to the
+        Opendatacube load function. Lazy loading allows query processing to
+        be parallelized over the chunks, and results are only computed into
+        memory at the end of query execution. Defaults to :obj:`None`,
+        meaning that data are loaded eagerly.
+
   .. _Opendatacube manual:
     https://datacube-core.readthedocs.io/en/latest/index.html
 
@@ -197,7 +206,8 @@ class Opendatacube(Datacube):
         "binary": "nearest",
         "continuous": "nearest",
         "discrete": "nearest"
-      }
+      },
+      "dask_chunks": None
     }
 
   @property
@@ -315,7 +325,8 @@ class Opendatacube(Datacube):
       measurements = [metadata["name"]],
       like = like,
       resampling = self.config["resamplers"][metadata["type"]],
-      group_by = "solar_day" if self.config["group_by_solar_day"] else None
+      group_by = "solar_day" if self.config["group_by_solar_day"] else None,
+      dask_chunks = self.config["dask_chunks"]
     )
     # Return as xarray dataarray.
     try:
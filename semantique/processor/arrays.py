@@ -108,6 +108,12 @@ class Array():
   @property
   def is_empty(self):
     """:obj:`bool`: Is the array empty."""
+    if self._obj.chunks is not None:
+      # Inspecting the values of a dask-backed array would compute its full
+      # task graph, and this property is checked after every processing step.
+      # Chunked arrays are therefore assumed to be non-empty, such that they
+      # stay lazy until the end of query execution.
+      return self._obj.size == 0
     try:
       return self._obj.values.size == 0 or not np.any(np.isfinite(self._obj))
     except TypeError:
@@ -300,7 +306,10 @@ class Array():
         )
     # Update filterer.
     # Xarray treats null values as True but they should not pass the filter.
-    filterer.values = utils.null_as_zero(filterer)
+    # Test for truthy non-null values directly, with byte-sized boolean
+    # temporaries instead of a full-width zeroed copy of the filterer.
+    vals = filterer.values
+    filterer.values = np.logical_and(pd.notnull(vals), np.not_equal(vals, 0))
     # Apply filter.
     out = self._obj.where(filterer.sq.align_with(self._obj))
     return out
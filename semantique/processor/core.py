@@ -4,12 +4,13 @@ import numpy as np
 import copy
 import inspect
 import logging
+import concurrent.futures
 import pyproj
 import pytz
 import warnings
 
 from semantique import exceptions
-from semantique.processor import arrays, operators, reducers, values, utils
+from semantique.processor import arrays, fused, operators, reducers, values, utils
 
 logger = logging.getLogger(__name__)
 
@@ -257,11 +258,14 @@ class QueryProcessor():
 
     Note
     -----
-      In the current version of semantique, the optimization phase only exists
-      as a placeholder, and no properties are updated yet.
+      In the current version of semantique, the optimization phase does not
+      update any properties yet. It does however compile the fused reduction
+      kernels ahead of time, such that query execution is not stalled by
+      just-in-time compilation during its first reduction.
 
     """
     logger.info("Started optimizing the semantic query")
+    fused.precompile()
     out = self
     logger.info("Finished optimizing the semantic query")
     return out
@@ -279,23 +283,70 @@ class QueryProcessor():
         An updated query processor instance, with a :attr:`response` property
         containing the resulting arrays.
 
+    Note
+    -----
+      When a recipe contains more than one result, the results are computed
+      concurrently in a thread pool. The numpy and numba kernels doing the
+      heavy lifting release the global interpreter lock, such that the
+      threads can overlap their work on multiple processor cores. Results
+      that are referenced by other results are computed up front, such that
+      each result is computed exactly once.
+
     """
     logger.info("Started executing the semantic query")
     # Execute instructions for each result in the recipe.
-    for x in self._recipe:
-      if x in self._response:
-        continue
-      logger.info(f"Started executing result: '{x}'")
-      result = self.call_handler(self._recipe[x])
-      result.name = x
-      self._response[x] = result
-      logger.info(f"Finished executing result: '{x}'")
+    # Each result is processed on its own shallow copy of the query
+    # processor, since handlers keep state such as the active evaluation
+    # object on the processor itself.
+    todo = [x for x in self._recipe if x not in self._response]
+    # Results referencing other results find them in the response. Compute
+    # the referenced results first, in recipe order, such that the threads
+    # computing the remaining results do not each recompute them.
+    refs = set()
+    for x in todo:
+      self._find_result_refs(self._recipe[x], refs)
+    for x in todo:
+      if x in refs and x not in self._response:
+        self._response[x] = self._execute_result(x)
+    todo = [x for x in todo if x not in self._response]
+    if len(todo) > 1:
+      with concurrent.futures.ThreadPoolExecutor() as pool:
+        tasks = {x: pool.submit(self._execute_result, x) for x in todo}
+      for x in todo:
+        self._response[x] = tasks[x].result()
+    else:
+      for x in todo:
+        self._response[x] = self._execute_result(x)
     # Post-process.
     out = self._response
     logger.info("Finished executing the semantic query")
     logger.debug(f"Responding:\n{out}")
     return out
 
+  def _execute_result(self, name):
+    logger.info(f"Started executing result: '{name}'")
+    qp = copy.copy(self)
+    qp._eval_obj = [self._extent]
+    result = qp.call_handler(self._recipe[name])
+    result.name = name
+    # Lazy dask-backed results are computed into memory at this point.
+    if getattr(result, "chunks", None) is not None:
+      result = result.load()
+    logger.info(f"Finished executing result: '{name}'")
+    return result
+
+  @staticmethod
+  def _find_result_refs(block, out):
+    """Collect the names of all result references inside a building block."""
+    if isinstance(block, dict):
+      if block.get("type") == "result" and "name" in block:
+        out.add(block["name"])
+      for value in block.values():
+        QueryProcessor._find_result_refs(value, out)
+    elif isinstance(block, (list, tuple)):
+      for value in block:
+        QueryProcessor._find_result_refs(value, out)
+
   def call_handler(self, block, key = "type"):
     """Call the handler for a specific building block.
 
@@ -0,0 +1,600 @@
+import numpy as np
+import pandas as pd
+
+from scipy import stats
+
+from semantique.processor import utils
+
+try:
+  import numba
+except ImportError:
+  numba = None
+
+def _as_2d(arr, axis):
+  """Reshape an array into two dimensions with the reduction axis last.
+
+  Fused reduction kernels are written for the simplest possible layout: a
+  two-dimensional array in which each row is one set of values to be reduced.
+  This helper brings an array of any dimensionality into that layout, by
+  moving the reduction axis to the last position and collapsing all remaining
+  axes into the first position. The relative order of the remaining axes is
+  preserved, such that the reduced output can be restored to its original
+  shape afterwards.
+
+  Parameters
+  ----------
+    arr : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int` or :obj:`tuple` of :obj:`int`
+      Axis or axes along which the reduction will be performed. If
+      :obj:`None`, the reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array` and :obj:`tuple`
+      The reshaped array and the shape of the reduced output.
+
+  """
+  if axis is None:
+    return arr.reshape(1, -1), ()
+  axes = axis if isinstance(axis, tuple) else (axis,)
+  axes = tuple(a % arr.ndim for a in axes)
+  if len(axes) >= arr.ndim:
+    return arr.reshape(1, -1), ()
+  last = tuple(range(arr.ndim - len(axes), arr.ndim))
+  if axes != last:
+    arr = np.moveaxis(arr, axes, last)
+  shape = arr.shape[:arr.ndim - len(axes)]
+  if not arr.flags["C_CONTIGUOUS"]:
+    arr = np.ascontiguousarray(arr)
+  return arr.reshape(int(np.prod(shape)), -1), shape
+
+if numba is not None:
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _nansum_count_2d(x):
+    n = x.shape[0]
+    sums = np.zeros(n, dtype = np.float64)
+    counts = np.zeros(n, dtype = np.int64)
+    for i in numba.prange(n):
+      s = 0.0
+      c = 0
+      for j in range(x.shape[1]):
+        v = x[i, j]
+        if v == v:
+          s += v
+          c += 1
+      sums[i] = s
+      counts[i] = c
+    return sums, counts
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _nanprod_count_2d(x):
+    n = x.shape[0]
+    prods = np.ones(n, dtype = np.float64)
+    counts = np.zeros(n, dtype = np.int64)
+    for i in numba.prange(n):
+      p = 1.0
+      c = 0
+      for j in range(x.shape[1]):
+        v = x[i, j]
+        if v == v:
+          p *= v
+          c += 1
+      prods[i] = p
+      counts[i] = c
+    return prods, counts
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _truthy_count_2d(x):
+    n = x.shape[0]
+    truthy = np.zeros(n, dtype = np.int64)
+    counts = np.zeros(n, dtype = np.int64)
+    for i in numba.prange(n):
+      t = 0
+      c = 0
+      for j in range(x.shape[1]):
+        v = x[i, j]
+        if v == v:
+          c += 1
+          if v != 0:
+            t += 1
+      truthy[i] = t
+      counts[i] = c
+    return truthy, counts
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _falsy_count_2d(x):
+    n = x.shape[0]
+    falsy = np.zeros(n, dtype = np.int64)
+    counts = np.zeros(n, dtype = np.int64)
+    for i in numba.prange(n):
+      f = 0
+      c = 0
+      for j in range(x.shape[1]):
+        v = x[i, j]
+        if v == v:
+          c += 1
+          if v == 0:
+            f += 1
+      falsy[i] = f
+      counts[i] = c
+    return falsy, counts
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _nanvar_welford_2d(x):
+    n = x.shape[0]
+    out = np.full(n, np.nan, dtype = np.float64)
+    for i in numba.prange(n):
+      c = 0
+      mean = 0.0
+      m2 = 0.0
+      for j in range(x.shape[1]):
+        v = x[i, j]
+        if v == v:
+          c += 1
+          d = v - mean
+          mean += d / c
+          m2 += d * (v - mean)
+      if c > 0:
+        out[i] = m2 / c
+    return out
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _mode_bincount_2d(x, vmin, nbins):
+    n = x.shape[0]
+    out = np.empty(n, dtype = np.int64)
+    for i in numba.prange(n):
+      counts = np.zeros(nbins, dtype = np.int64)
+      for j in range(x.shape[1]):
+        counts[x[i, j] - vmin] += 1
+      best = 0
+      for b in range(1, nbins):
+        if counts[b] > counts[best]:
+          best = b
+      out[i] = best + vmin
+    return out
+
+  @numba.njit(parallel = True, nogil = True, cache = True)
+  def _nanmode_sort_2d(x):
+    n = x.shape[0]
+    out = np.full(n, np.nan, dtype = np.float64)
+    for i in numba.prange(n):
+      row = np.sort(x[i])
+      # Null values sort to the end, so the first k values are non-null.
+      k = row.shape[0]
+      while k > 0 and not row[k - 1] == row[k - 1]:
+        k -= 1
+      if k == 0:
+        continue
+      # Equal values are adjacent after sorting, so the mode is the longest
+      # run. Scanning in ascending order returns the smallest modal value
+      # whenever there are ties.
+      best = row[0]
+      best_n = 1
+      cur_n = 1
+      for j in range(1, k):
+        if row[j] == row[j - 1]:
+          cur_n += 1
+        else:
+          cur_n = 1
+        if cur_n > best_n:
+          best_n = cur_n
+          best = row[j]
+      out[i] = best
+    return out
+
+def _supported(arr):
+  """Check if the fused numba kernels can be applied to an array."""
+  return numba is not None and arr.dtype.kind in "bif"
+
+def _match_float(values, arr):
+  """Cast reduced values back to the floating dtype of the input array.
+
+  The fused kernels accumulate in float64 for numerical stability, but the
+  reduced output should keep the (possibly narrower) floating dtype of the
+  input, matching the behaviour of the numpy nan-functions.
+
+  """
+  if arr.dtype.kind == "f" and values.dtype != arr.dtype:
+    return values.astype(arr.dtype)
+  return values
+
+_precompiled = False
+
+def precompile():
+  """Compile the fused reduction kernels ahead of their first use.
+
+  The fused kernels are compiled by numba on their first call, which would
+  otherwise stall the first reduction of a query. Calling this function
+  triggers compilation for the common dtype up front, e.g. during the
+  optimization phase of the query processor. Since the kernels are compiled
+  with on-disk caching enabled, compilation effectively happens once per
+  environment and later processes reuse the cached binaries. This function
+  is a no-op when numba is not installed.
+
+  """
+  global _precompiled
+  if numba is None or _precompiled:
+    return
+  x = np.zeros((1, 1))
+  _nansum_count_2d(x)
+  _nanvar_welford_2d(x)
+  _nanprod_count_2d(x)
+  _truthy_count_2d(x)
+  _falsy_count_2d(x)
+  _nanmode_sort_2d(x)
+  _mode_bincount_2d(np.zeros((1, 1), dtype = np.int64), 0, 1)
+  _precompiled = True
+
+def _is_lazy(x):
+  """Check if an array is a lazy dask-backed array rather than in memory."""
+  return hasattr(x, "dask")
+
+_POPCOUNT = np.unpackbits(
+  np.arange(256, dtype = np.uint8).reshape(-1, 1), axis = 1
+).sum(axis = 1)
+""":obj:`numpy.array`: Number of set bits for each possible byte value."""
+
+def _truthy_count_packed(arr, axis):
+  """Count the true values in a boolean array through bit packing.
+
+  Packs the values along the reduction axis into bytes and counts the set
+  bits per byte with a popcount lookup table. The packed representation
+  moves eight times fewer bytes through memory than scanning the one-byte
+  boolean values, which matters since counting is memory-bound. Bits used
+  to pad the last byte of each set are zero and therefore do not affect the
+  count.
+
+  Parameters
+  ----------
+    arr : :obj:`numpy.array`
+      The boolean array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`numpy.array`
+      The number of true values.
+
+  """
+  x2d, shape = _as_2d(arr, axis)
+  packed = np.packbits(x2d, axis = 1)
+  return np.sum(_POPCOUNT[packed], axis = 1).reshape(shape)
+
+def _as_uint8_truth(arr):
+  """Quantize a floating point truth array to single bytes.
+
+  Binary arrays in semantique are commonly stored as floating point values
+  with nan marking nodata. For counting reductions only three states matter:
+  true, false and null. Encoding these as uint8 values (1, 0 and the
+  sentinel 255) shrinks the working set four to eight times compared to
+  float32/float64, which pays off on memory-bound reductions, and makes the
+  states testable with cheap integer comparisons against the packed-bit
+  counting path.
+
+  Parameters
+  ----------
+    arr : :obj:`numpy.array`
+      The floating point array to be quantized.
+
+  Returns
+  -------
+    :obj:`numpy.array`
+      The quantized array, with 1 for true, 0 for false and 255 for null.
+
+  """
+  return np.where(pd.notnull(arr), np.not_equal(arr, 0), 255).astype(np.uint8)
+
+_BLOCK_BYTES = 1 << 22
+""":obj:`int`: Approximate tile size in bytes for blocked numpy reductions."""
+
+def _block_rows(x2d):
+  """Return the number of rows per tile for a blocked numpy reduction.
+
+  The numpy fallback paths derive multiple statistics from intermediate
+  arrays such as the null mask. Processing the two-dimensional reduction
+  view one tile of rows at a time keeps those intermediates resident in the
+  cache while all statistics are derived from them, instead of allocating
+  them at the full size of the input and streaming the input multiple
+  times. Tiles are sized to roughly the last-level cache.
+
+  """
+  row_bytes = x2d.shape[1] * x2d.dtype.itemsize
+  return max(1, _BLOCK_BYTES // max(1, row_bytes))
+
+def _count_along(arr, axis):
+  """Return the number of values in each reduced set of an array.
+
+  Used instead of a null mask for arrays that cannot contain nulls, such
+  as boolean arrays. Returns a scalar, which broadcasts against the reduced
+  values.
+
+  """
+  if axis is None:
+    return arr.size
+  if isinstance(axis, tuple):
+    n = 1
+    for a in axis:
+      n = n * arr.shape[a]
+    return n
+  return arr.shape[axis]
+
+def nanmode(x, axis = None):
+  """Return the most occurring non-null value in an array.
+
+  Computing the mode through :func:`scipy.stats.mode` sorts the full array
+  and builds heavy intermediate structures. When numba is installed the mode
+  is instead computed per output cell: with a local histogram for integer
+  and boolean values (the common case of classification rasters), or with a
+  sort and run-length scan for floating point values. If there are multiple
+  modal values in a set, the minimum of them is returned, and sets without
+  any non-null value return null, both matching the scipy behaviour.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`numpy.array`
+      The most occurring values.
+
+  """
+  arr = np.asarray(x)
+  if numba is not None and arr.dtype.kind in "biu":
+    x2d, shape = _as_2d(arr, axis)
+    vmin = int(np.min(x2d))
+    nbins = int(np.max(x2d)) - vmin + 1
+    # A histogram per output cell is only worthwhile when the value range is
+    # small, as for land-cover classes. Wide-range integers take the sort
+    # path instead.
+    if nbins <= 65536:
+      out = _mode_bincount_2d(x2d, vmin, nbins)
+      return out.astype(arr.dtype).reshape(shape)
+    arr = arr.astype(np.float64)
+  if numba is not None and arr.dtype.kind == "f":
+    x2d, shape = _as_2d(arr, axis)
+    return _match_float(_nanmode_sort_2d(x2d), arr).reshape(shape)
+  values = stats.mode(arr, axis = axis, nan_policy = "omit")[0]
+  return np.where(utils.allnull(arr, axis), utils.get_null(arr), values)
+
+def nanvar(x, axis = None):
+  """Calculate the variance of the non-null values in an array.
+
+  Computing the variance through :func:`numpy.nanvar` traverses the data
+  twice: once for the mean and once for the squared deviations. Welford's
+  online algorithm obtains the same result in a single numerically stable
+  streaming pass, halving the memory traffic of what is a memory-bound
+  computation. Matches the population variance (zero delta degrees of
+  freedom) computed by numpy, and returns null for sets without any
+  non-null value. Falls back to :func:`numpy.nanvar` when numba is not
+  installed or the values are of an unsupported dtype.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`numpy.array`
+      The variance of the non-null values.
+
+  """
+  if _is_lazy(x):
+    return np.nanvar(x, axis)
+  arr = np.asarray(x)
+  if _supported(arr):
+    x2d, shape = _as_2d(arr, axis)
+    return _match_float(_nanvar_welford_2d(x2d), arr).reshape(shape)
+  if arr.dtype.kind in "biu":
+    return np.var(arr, axis)
+  return np.nanvar(arr, axis)
+
+def nanstd(x, axis = None):
+  """Calculate the standard deviation of the non-null values in an array.
+
+  Computed as the square root of the single-pass variance, see
+  :func:`nanvar`.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`numpy.array`
+      The standard deviation of the non-null values.
+
+  """
+  return np.sqrt(nanvar(x, axis))
+
+def nansum_count(x, axis = None):
+  """Sum the non-null values in an array and count them in a single pass.
+
+  Summing values and counting the non-null ones among them both traverse the
+  full array. Since reductions on large arrays are memory-bound, fusing the
+  two traversals into a single streaming pass approximately halves the
+  reduction time. If numba is not installed, or the values are of a dtype
+  the fused kernel does not support, two separate numpy passes are made
+  instead.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array`
+      The summed values and the number of non-null values.
+
+  """
+  if _is_lazy(x):
+    # Numpy functions dispatch to lazy equivalents for dask arrays.
+    return np.nansum(x, axis), np.sum(~np.isnan(x), axis)
+  arr = np.asarray(x)
+  if _supported(arr):
+    x2d, shape = _as_2d(arr, axis)
+    s, c = _nansum_count_2d(x2d)
+    return _match_float(s, arr).reshape(shape), c.reshape(shape)
+  if arr.dtype.kind in "biu":
+    return np.sum(arr, axis), _count_along(arr, axis)
+  x2d, shape = _as_2d(arr, axis)
+  s = np.empty(x2d.shape[0], dtype = x2d.dtype if x2d.dtype.kind == "f" else None)
+  c = np.empty(x2d.shape[0], dtype = np.int64)
+  step = _block_rows(x2d)
+  for i in range(0, x2d.shape[0], step):
+    tile = x2d[i:i + step]
+    mask = pd.notnull(tile)
+    s[i:i + step] = np.sum(np.where(mask, tile, 0), axis = 1)
+    c[i:i + step] = np.sum(mask, axis = 1)
+  return s.reshape(shape), c.reshape(shape)
+
+def nanprod_count(x, axis = None):
+  """Multiply the non-null values in an array and count them in a single pass.
+
+  See :func:`nansum_count` for the rationale behind fusing the two
+  traversals.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array`
+      The multiplied values and the number of non-null values.
+
+  """
+  if _is_lazy(x):
+    # Numpy functions dispatch to lazy equivalents for dask arrays.
+    return np.nanprod(x, axis), np.sum(~np.isnan(x), axis)
+  arr = np.asarray(x)
+  if _supported(arr):
+    x2d, shape = _as_2d(arr, axis)
+    p, c = _nanprod_count_2d(x2d)
+    return _match_float(p, arr).reshape(shape), c.reshape(shape)
+  if arr.dtype.kind in "biu":
+    return np.prod(arr, axis), _count_along(arr, axis)
+  x2d, shape = _as_2d(arr, axis)
+  p = np.empty(x2d.shape[0], dtype = x2d.dtype if x2d.dtype.kind == "f" else None)
+  c = np.empty(x2d.shape[0], dtype = np.int64)
+  step = _block_rows(x2d)
+  for i in range(0, x2d.shape[0], step):
+    tile = x2d[i:i + step]
+    mask = pd.notnull(tile)
+    p[i:i + step] = np.prod(np.where(mask, tile, 1), axis = 1)
+    c[i:i + step] = np.sum(mask, axis = 1)
+  return p.reshape(shape), c.reshape(shape)
+
+def truthy_count(x, axis = None):
+  """Count the true values and the non-null values in a single pass.
+
+  See :func:`nansum_count` for the rationale behind fusing the two
+  traversals.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array`
+      The number of true values and the number of non-null values.
+
+  """
+  if _is_lazy(x):
+    # Numpy functions dispatch to lazy equivalents for dask arrays.
+    mask = ~np.isnan(x)
+    truthy = np.count_nonzero(np.where(mask, x, 0), axis)
+    return truthy, np.sum(mask, axis)
+  arr = np.asarray(x)
+  if arr.dtype.kind == "b":
+    return _truthy_count_packed(arr, axis), _count_along(arr, axis)
+  if arr.dtype.kind in "iu":
+    return np.count_nonzero(arr, axis), _count_along(arr, axis)
+  if _supported(arr):
+    x2d, shape = _as_2d(arr, axis)
+    t, c = _truthy_count_2d(x2d)
+    return t.reshape(shape), c.reshape(shape)
+  if arr.dtype.kind == "f":
+    u = _as_uint8_truth(arr)
+    truthy = _truthy_count_packed(np.equal(u, 1), axis)
+    nulls = _truthy_count_packed(np.equal(u, 255), axis)
+    return truthy, np.subtract(_count_along(arr, axis), nulls)
+  mask = pd.notnull(arr)
+  truthy = np.count_nonzero(np.where(mask, arr, 0), axis)
+  return truthy, np.sum(mask, axis)
+
+def falsy_count(x, axis = None):
+  """Count the false values and the non-null values in a single pass.
+
+  See :func:`nansum_count` for the rationale behind fusing the two
+  traversals.
+
+  Parameters
+  ----------
+    x : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction is performed. If :obj:`None`, the
+      reduction is performed over all axes.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array`
+      The number of false values and the number of non-null values.
+
+  """
+  if _is_lazy(x):
+    # Numpy functions dispatch to lazy equivalents for dask arrays.
+    mask = ~np.isnan(x)
+    n = np.sum(mask, axis)
+    truthy = np.count_nonzero(np.where(mask, x, 0), axis)
+    return np.subtract(n, truthy), n
+  arr = np.asarray(x)
+  if arr.dtype.kind == "b":
+    n = _count_along(arr, axis)
+    return np.subtract(n, _truthy_count_packed(arr, axis)), n
+  if arr.dtype.kind in "iu":
+    n = _count_along(arr, axis)
+    return np.subtract(n, np.count_nonzero(arr, axis)), n
+  if _supported(arr):
+    x2d, shape = _as_2d(arr, axis)
+    f, c = _falsy_count_2d(x2d)
+    return f.reshape(shape), c.reshape(shape)
+  if arr.dtype.kind == "f":
+    u = _as_uint8_truth(arr)
+    falsy = _truthy_count_packed(np.equal(u, 0), axis)
+    nulls = _truthy_count_packed(np.equal(u, 255), axis)
+    return falsy, np.subtract(_count_along(arr, axis), nulls)
+  mask = pd.notnull(arr)
+  n = np.sum(mask, axis)
+  truthy = np.count_nonzero(np.where(mask, arr, 0), axis)
+  return np.subtract(n, truthy), n
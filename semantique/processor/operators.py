@@ -1219,7 +1219,9 @@ def and_(x, y, track_types = True, **kwargs):
     promoter = TypePromoter(x, y, function = "and")
     promoter.check()
   def f(x, y):
-    y = utils.null_as_zero(y)
+    # Treat null values in y as false, with byte-sized boolean temporaries
+    # instead of a full-width zeroed copy of y.
+    y = np.logical_and(pd.notnull(y), np.not_equal(y, 0))
     return np.where(pd.notnull(x), np.logical_and(x, y), np.nan)
   y = xr.DataArray(y).sq.align_with(x)
   out = xr.apply_ufunc(f, x, y, keep_attrs = True)
@@ -1282,7 +1284,9 @@ def or_(x, y, track_types = True, **kwargs):
     promoter = TypePromoter(x, y, function = "or")
     promoter.check()
   def f(x, y):
-    y = utils.null_as_zero(y)
+    # Treat null values in y as false, with byte-sized boolean temporaries
+    # instead of a full-width zeroed copy of y.
+    y = np.logical_and(pd.notnull(y), np.not_equal(y, 0))
     return np.where(pd.notnull(x), np.logical_or(x, y), np.nan)
   y = xr.DataArray(y).sq.align_with(x)
   out = xr.apply_ufunc(f, x, y, keep_attrs = True)
@@ -1345,7 +1349,9 @@ def exclusive_or_(x, y, track_types = True, **kwargs):
     promoter = TypePromoter(x, y, function = "exclusive_or")
     promoter.check()
   def f(x, y):
-    y = utils.null_as_zero(y)
+    # Treat null values in y as false, with byte-sized boolean temporaries
+    # instead of a full-width zeroed copy of y.
+    y = np.logical_and(pd.notnull(y), np.not_equal(y, 0))
     return np.where(pd.notnull(x), np.logical_xor(x, y), np.nan)
   y = xr.DataArray(y).sq.align_with(x)
   out = xr.apply_ufunc(f, x, y, keep_attrs = True)
@@ -1,11 +1,130 @@
 import pandas as pd
 import numpy as np
+import xarray as xr
 
-from scipy import stats
-
-from semantique.processor import utils
+from semantique.processor import fused, utils
 from semantique.processor.types import TypePromoter
 
+def _normalize_axis(arr, axis):
+  """Move a reduction axis to the fastest-varying position of an array.
+
+  Numpy reduction kernels are considerably slower when the reduction axis is
+  not the fastest-varying axis in memory, since they then stride through the
+  array instead of streaming over contiguous values. This helper transposes
+  the array such that the reduction axis becomes the innermost axis, i.e. the
+  last axis for C-ordered arrays and the first axis for Fortran-ordered
+  arrays. The relative order of the remaining axes is preserved, such that
+  the shape of the reduced output does not change. If the reduction axis is
+  already innermost the array is returned as-is, without copying.
+
+  Parameters
+  ----------
+    arr : :obj:`numpy.array`
+      The array to be reduced.
+    axis : :obj:`int`
+      Axis along which the reduction will be performed.
+
+  Returns
+  -------
+    :obj:`tuple` of :obj:`numpy.array` and :obj:`int`
+      The transposed array and the new reduction axis.
+
+  """
+  axis = axis % arr.ndim
+  if arr.flags["F_CONTIGUOUS"] and not arr.flags["C_CONTIGUOUS"]:
+    if axis == 0:
+      return arr, axis
+    return np.asfortranarray(np.moveaxis(arr, axis, 0)), 0
+  if axis == arr.ndim - 1:
+    return arr, axis
+  return np.ascontiguousarray(np.moveaxis(arr, axis, -1)), arr.ndim - 1
+
+def _reduce(x, f, dim = None, empty = np.nan, **kwargs):
+  """Apply a reduction function directly to the values of an array.
+
+  Calling :meth:`xarray.DataArray.reduce` adds considerable overhead to each
+  reduction, since xarray rebuilds intermediate DataArray objects while
+  resolving the reduction dimension. This helper instead resolves the
+  dimension to a plain axis number, applies the numpy kernel directly to the
+  values of the array, and wraps the resulting ndarray back into a DataArray
+  with the remaining dimensions, coordinates and attributes.
+
+  Parameters
+  ----------
+    x : :obj:`xarray.DataArray`
+      The array to be reduced. May also be a rolling window object as
+      constructed by the smooth verb, in which case the reduction is
+      delegated to the reduce method of that object.
+    f : :obj:`callable`
+      The reduction kernel to be applied. Should accept an ndarray as first
+      positional argument and a keyword argument "axis".
+    dim : :obj:`str` or :obj:`list` of :obj:`str`
+      Name of the dimension to apply the reduction function to. Multiple
+      dimensions may be given as a list, in which case all of them are
+      reduced in a single vectorized kernel call, rather than one dimension
+      at a time. If :obj:`None`, all dimensions are reduced.
+    empty:
+      Value to fill the output with when the reduced dimension is empty.
+      Defaults to null, which fits all reducers except the observation
+      count, for which an empty set contains zero observations.
+    **kwargs:
+      Additional keyword arguments passed on to the kernel.
+
+  Returns
+  -------
+    :obj:`xarray.DataArray`
+      The reduced array.
+
+  """
+  if not isinstance(x, xr.DataArray):
+    # Rolling window objects constructed by the smooth verb implement their
+    # own reduce method, which resolves the window dimensions itself.
+    return x.reduce(f, **kwargs)
+  if x.chunks is not None:
+    # Dask-backed arrays are reduced through xarray instead, such that the
+    # reduction stays lazy and is parallelized over the chunks.
+    return x.reduce(f, dim = dim, **kwargs)
+  dims = list(x.dims) if dim is None else \
+    [dim] if isinstance(dim, str) else list(dim)
+  if any(x.sizes[d] == 0 for d in dims):
+    # Reducing an empty set of values yields all-null output. The numpy
+    # kernels would raise on empty input instead, so the output is built
+    # directly. The count reduction serves as a cheap template here, being
+    # one of the few kernels that accepts empty input for any dtype.
+    template = x.count(dim, keep_attrs = True)
+    return template.copy(data = np.full(template.shape, empty))
+  if dim is None:
+    return xr.DataArray(f(x.values, axis = None, **kwargs), attrs = x.attrs)
+  if len(dims) == 1:
+    arr, axis = _normalize_axis(x.values, x.get_axis_num(dims[0]))
+  else:
+    # Reduce all given dimensions in one multi-axis kernel call. The axes
+    # are moved to the innermost positions first, such that the kernel
+    # streams over contiguous values.
+    axes = tuple(x.get_axis_num(d) for d in dims)
+    arr = np.moveaxis(x.values, axes, range(-len(axes), 0))
+    if not arr.flags["C_CONTIGUOUS"]:
+      arr = np.ascontiguousarray(arr)
+    axis = tuple(range(arr.ndim - len(axes), arr.ndim))
+  vals = f(arr, axis = axis, **kwargs)
+  # Wrap the reduced values back into a DataArray. This happens only once
+  # per reducer call: the values pass between kernel stages as raw ndarrays.
+  # Selecting a single slice along the reduced dimensions gives a cheap
+  # template with the remaining dimensions, coordinates and attributes of
+  # the input. The copy is shallow, such that the (potentially large)
+  # coordinate arrays are shared with the input instead of being rebuilt.
+  template = x.isel({d: 0 for d in dims}, drop = True)
+  # Coordinates spanning both a reduced and a remaining dimension would stay
+  # behind sliced at the first index of the reduced dimension. Drop them,
+  # like xarray does, since their values are stale after the reduction.
+  stale = [
+    k for k, v in x.coords.items()
+    if any(d in v.dims for d in dims) and any(d not in dims for d in v.dims)
+  ]
+  if stale:
+    template = template.drop_vars(stale)
+  return template.copy(deep = False, data = vals)
+
 #
 # STATISTICAL REDUCERS
 #
@@ -49,8 +168,16 @@ def mean_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "mean")
     promoter.check()
   def f(x, axis = None):
-    return np.nanmean(x, axis = axis)
-  out = x.reduce(f, **kwargs)
+    if x.dtype.kind in "biu":
+      # Arrays of these dtypes cannot contain nulls, so the plain kernel
+      # can be used, which skips the null checks in its inner loop.
+      return np.mean(x, axis = axis)
+    values, n = fused.nansum_count(x, axis)
+    # Casting the counts to the dtype of the sums keeps the division from
+    # promoting e.g. float32 values to float64.
+    n_safe = np.where(np.equal(n, 0), 1, n).astype(values.dtype)
+    return np.where(np.equal(n, 0), np.nan, np.divide(values, n_safe))
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -94,8 +221,10 @@ def median_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "median")
     promoter.check()
   def f(x, axis = None):
+    if x.dtype.kind in "biu":
+      return np.median(x, axis = axis)
     return np.nanmedian(x, axis = axis)
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -144,9 +273,8 @@ def mode_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "mode")
     promoter.check()
   def f(x, axis = None):
-    values = stats.mode(x, axis = axis, nan_policy = "omit")[0]
-    return np.where(utils.allnull(x, axis), utils.get_null(x), values)
-  out = x.reduce(f, **kwargs)
+    return fused.nanmode(x, axis)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -190,8 +318,10 @@ def max_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "max")
     promoter.check()
   def f(x, axis = None):
+    if x.dtype.kind in "biu":
+      return np.max(x, axis)
     return np.nanmax(x, axis)
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -235,8 +365,10 @@ def min_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "min")
     promoter.check()
   def f(x, axis = None):
+    if x.dtype.kind in "biu":
+      return np.min(x, axis)
     return np.nanmin(x, axis)
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -286,8 +418,10 @@ def range_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "range")
     promoter.check()
   def f(x, axis = None):
+    if x.dtype.kind in "biu":
+      return np.subtract(np.max(x, axis), np.min(x, axis))
     return np.subtract(np.nanmax(x, axis), np.nanmin(x, axis))
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -337,8 +471,19 @@ def n_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "n")
     promoter.check()
   def f(x, axis = None):
+    if x.dtype.kind in "biu":
+      # Arrays of these dtypes cannot contain nulls, so each set contains
+      # as many observations as its size.
+      if axis is None:
+        return x.size
+      axes = axis if isinstance(axis, tuple) else (axis,)
+      shape = [s for a, s in enumerate(x.shape) if a not in axes]
+      n = 1
+      for a in axes:
+        n = n * x.shape[a]
+      return np.full(shape, n)
     return np.nansum(pd.notnull(x), axis)
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, empty = 0, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -382,8 +527,9 @@ def product_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "product")
     promoter.check()
   def f(x, axis = None):
-    return np.where(utils.allnull(x, axis), np.nan, np.nanprod(x, axis))
-  out = x.reduce(f, **kwargs)
+    values, n = fused.nanprod_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, values)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -427,8 +573,8 @@ def standard_deviation_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "standard_deviation")
     promoter.check()
   def f(x, axis = None):
-    return np.nanstd(x, axis = axis)
-  out = x.reduce(f, **kwargs)
+    return fused.nanstd(x, axis)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -472,8 +618,9 @@ def sum_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "sum")
     promoter.check()
   def f(x, axis = None):
-    return np.where(utils.allnull(x, axis), np.nan, np.nansum(x, axis))
-  out = x.reduce(f, **kwargs)
+    values, n = fused.nansum_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, values)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -517,8 +664,8 @@ def variance_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "variance")
     promoter.check()
   def f(x, axis = None):
-    return np.nanvar(x, axis = axis)
-  out = x.reduce(f, **kwargs)
+    return fused.nanvar(x, axis)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -566,9 +713,9 @@ def all_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "all")
     promoter.check()
   def f(x, axis = None):
-    values = np.all(x, axis)
-    return np.where(utils.allnull(x, axis), np.nan, values)
-  out = x.reduce(f, **kwargs)
+    falsy, n = fused.falsy_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, np.equal(falsy, 0))
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -617,9 +764,9 @@ def any_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "any")
     promoter.check()
   def f(x, axis = None):
-    values = np.any(utils.null_as_zero(x), axis)
-    return np.where(utils.allnull(x, axis), np.nan, values)
-  out = x.reduce(f, **kwargs)
+    truthy, n = fused.truthy_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, np.greater(truthy, 0))
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -668,9 +815,9 @@ def none_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "none")
     promoter.check()
   def f(x, axis = None):
-    values = np.logical_not(np.any(utils.null_as_zero(x), axis))
-    return np.where(utils.allnull(x, axis), np.nan, values)
-  out = x.reduce(f, **kwargs)
+    truthy, n = fused.truthy_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, np.equal(truthy, 0))
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -718,9 +865,9 @@ def count_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "count")
     promoter.check()
   def f(x, axis = None):
-    values = np.count_nonzero(utils.null_as_zero(x), axis)
-    return np.where(utils.allnull(x, axis), np.nan, values)
-  out = x.reduce(f, **kwargs)
+    truthy, n = fused.truthy_count(x, axis)
+    return np.where(np.equal(n, 0), np.nan, truthy)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -770,11 +917,10 @@ def percentage_(x, track_types = True, **kwargs):
     promoter = TypePromoter(x, function = "percentage")
     promoter.check()
   def f(x, axis = None):
-    part = np.count_nonzero(utils.null_as_zero(x), axis)
-    part = np.where(utils.allnull(x, axis), np.nan, part)
-    whole = np.sum(pd.notnull(x), axis)
+    part, whole = fused.truthy_count(x, axis)
+    part = np.where(np.equal(whole, 0), np.nan, part)
     return np.multiply(np.divide(part, whole), 100)
-  out = x.reduce(f, **kwargs)
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -827,21 +973,26 @@ def first_(x, track_types = True, **kwargs):
   if track_types:
     promoter = TypePromoter(x, function = "first")
     promoter.check()
-  def get_first(col):
+  def f(x, axis = None):
+    if axis is None:
+      x = np.ravel(x)
+      axis = 0
     # The idea here is as follows:
     # --> First mark non-missing values as True (i.e. 1).
-    # --> Then take twice the cumulative sum of this array.
-    # --> Only the first non-missing value will then be 1.
-    is_value = pd.notnull(col)
-    is_first = np.equal(np.cumsum(np.cumsum(is_value)), 1)
-    if any(is_first):
-      return col[np.argwhere(is_first)[0][0]]
-    else:
-      return utils.get_null(x)
-  def f(x, axis = None):
-    # Find the first non-missing value for each column along the dimension.
-    return np.apply_along_axis(get_first, axis, x)
-  out = x.reduce(f, **kwargs)
+    # --> The index of the first True is then found by argmax, which scans
+    #     the mask only once and stops allocating full-size temporaries.
+    # --> Gather the values at those indices along the dimension.
+    is_value = pd.notnull(x)
+    idx = np.expand_dims(np.argmax(is_value, axis = axis), axis)
+    values = np.squeeze(np.take_along_axis(x, idx, axis = axis), axis = axis)
+    # Columns without any non-missing value should return null instead.
+    return np.where(np.any(is_value, axis = axis), values, utils.get_null(x))
+  if getattr(x, "chunks", None) is not None:
+    # The positional gather through np.take_along_axis has no lazy dask
+    # counterpart, so the input is computed into memory up front instead of
+    # relying on dask's deprecated numpy fallback.
+    x = x.load()
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
@@ -890,23 +1041,30 @@ def last_(x, track_types = True, **kwargs):
   if track_types:
     promoter = TypePromoter(x, function = "last")
     promoter.check()
-  def get_first(col):
+  def f(x, axis = None):
+    if axis is None:
+      x = np.ravel(x)
+      axis = 0
     # The idea here is as follows:
     # --> First mark non-missing values as True (i.e. 1).
-    # --> Then take twice the cumulative sum of this array.
-    # --> Only the first non-missing value will then be 1.
-    is_value = pd.notnull(col)
-    is_first = np.equal(np.cumsum(np.cumsum(is_value)), 1)
-    if any(is_first):
-      return col[np.argwhere(is_first)[0][0]]
-    else:
-      return utils.get_null(x)
-  def f(x, axis = None):
-    # First flip the array such that last values become first values.
-    # Then find the first non-missing value for each column along the dimension.
-    xflipped = np.flip(x, axis)
-    return np.apply_along_axis(get_first, axis, xflipped)
-  out = x.reduce(f, **kwargs)
+    # --> Then find the first True in the back-to-front reversed mask with
+    #     argmax, and translate it back to an index in the original order.
+    #     The reversed mask is a strided view obtained by slicing, so at no
+    #     point is the data array (or even the mask) copied in reverse.
+    # --> Gather the values at those indices along the dimension.
+    is_value = pd.notnull(x)
+    rev = is_value[(slice(None),) * axis + (slice(None, None, -1),)]
+    rev_idx = np.argmax(rev, axis = axis)
+    idx = np.expand_dims(x.shape[axis] - 1 - rev_idx, axis)
+    values = np.squeeze(np.take_along_axis(x, idx, axis = axis), axis = axis)
+    # Columns without any non-missing value should return null instead.
+    return np.where(np.any(is_value, axis = axis), values, utils.get_null(x))
+  if getattr(x, "chunks", None) is not None:
+    # The positional gather through np.take_along_axis has no lazy dask
+    # counterpart, so the input is computed into memory up front instead of
+    # relying on dask's deprecated numpy fallback.
+    x = x.load()
+  out = _reduce(x, f, **kwargs)
   if track_types:
     out = promoter.promote(out)
   return out
\ No newline at end of file
@@ -20,6 +20,11 @@ dependencies = [
   'xarray>=0.20'
 ]
 
+# List optional dependencies.
+extras = {
+  'accel': ['numba']
+}
+
 # Setup.
 setup(
   name = "semantique",
@@ -32,5 +37,6 @@ setup(
   author_email = "lucas.vandermeer@sbg.ac.at",
   packages = find_packages(),
   python_requires = ">=3.9",
-  install_requires = dependencies
+  install_requires = dependencies,
+  extras_require = extras
 )
\ No newline at end of file
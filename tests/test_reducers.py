@@ -0,0 +1,134 @@
+import unittest
+
+import semantique as sq
+import numpy as np
+import xarray as xr
+
+from xarray import testing
+
+from semantique.processor import reducers
+
+o = np.nan
+
+class TestStatisticalReducers(unittest.TestCase):
+
+  def test_float_with_nulls(self):
+    x = xr.DataArray([[1, 2, 3], [4, o, o], [o, o, o]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.mean_(x, **kwargs), xr.DataArray([2, 4, o]))
+    testing.assert_equal(reducers.median_(x, **kwargs), xr.DataArray([2, 4, o]))
+    testing.assert_equal(reducers.max_(x, **kwargs), xr.DataArray([3, 4, o]))
+    testing.assert_equal(reducers.min_(x, **kwargs), xr.DataArray([1, 4, o]))
+    testing.assert_equal(reducers.range_(x, **kwargs), xr.DataArray([2, 0, o]))
+    testing.assert_equal(reducers.sum_(x, **kwargs), xr.DataArray([6, 4, o]))
+    testing.assert_equal(reducers.product_(x, **kwargs), xr.DataArray([6, 4, o]))
+    testing.assert_equal(reducers.n_(x, **kwargs), xr.DataArray([3, 1, 0]))
+
+  def test_variance(self):
+    x = xr.DataArray([[1, 2, 3, 4], [5, o, o, o], [o, o, o, o]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    f = xr.DataArray([1.25, 0, o])
+    g = xr.DataArray(np.sqrt([1.25, 0, o]))
+    testing.assert_allclose(reducers.variance_(x, **kwargs), f)
+    testing.assert_allclose(reducers.standard_deviation_(x, **kwargs), g)
+
+  def test_mode(self):
+    x = xr.DataArray([[1, 2, 2], [3, o, o], [o, o, o]])
+    y = xr.DataArray([[1, 1, 2, 2]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.mode_(x, **kwargs), xr.DataArray([2, 3, o]))
+    # Ties should resolve to the smallest modal value.
+    testing.assert_equal(reducers.mode_(y, **kwargs), xr.DataArray([1]))
+
+  def test_integer(self):
+    x = xr.DataArray([[1, 2, 3], [4, 5, 6]])
+    x = x.astype(np.int64)
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.mean_(x, **kwargs), xr.DataArray([2, 5]))
+    testing.assert_equal(reducers.sum_(x, **kwargs), xr.DataArray([6, 15]))
+    testing.assert_equal(reducers.n_(x, **kwargs), xr.DataArray([3, 3]))
+
+  def test_float32_dtype(self):
+    x = xr.DataArray(np.ones((2, 3), dtype = np.float32))
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    self.assertEqual(reducers.mean_(x, **kwargs).dtype, np.float32)
+    self.assertEqual(reducers.sum_(x, **kwargs).dtype, np.float32)
+    self.assertEqual(reducers.product_(x, **kwargs).dtype, np.float32)
+    self.assertEqual(reducers.variance_(x, **kwargs).dtype, np.float32)
+
+  def test_multiple_dimensions(self):
+    x = xr.DataArray(np.arange(8, dtype = float).reshape(2, 2, 2))
+    kwargs = {"track_types": False, "dim": ["dim_1", "dim_2"]}
+    testing.assert_equal(reducers.sum_(x, **kwargs), xr.DataArray([6, 22]))
+    testing.assert_equal(reducers.n_(x, **kwargs), xr.DataArray([4, 4]))
+    testing.assert_equal(reducers.max_(x, **kwargs), xr.DataArray([3, 7]))
+
+  def test_all_dimensions(self):
+    x = xr.DataArray([[1, 2], [3, o]])
+    f = reducers.sum_(x, track_types = False)
+    testing.assert_equal(f, xr.DataArray(6.0))
+
+class TestBooleanReducers(unittest.TestCase):
+
+  def test_float_with_nulls(self):
+    x = xr.DataArray([[1, 1, 1], [1, 0, 1], [0, 0, o], [o, o, o]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.all_(x, **kwargs), xr.DataArray([1, 0, 0, o]))
+    testing.assert_equal(reducers.any_(x, **kwargs), xr.DataArray([1, 1, 0, o]))
+    testing.assert_equal(reducers.none_(x, **kwargs), xr.DataArray([0, 0, 1, o]))
+    testing.assert_equal(reducers.count_(x, **kwargs), xr.DataArray([3, 2, 0, o]))
+    f = xr.DataArray([100, 2 / 3 * 100, 0, o])
+    testing.assert_allclose(reducers.percentage_(x, **kwargs), f)
+
+  def test_boolean(self):
+    x = xr.DataArray([[True, True], [True, False], [False, False]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.all_(x, **kwargs), xr.DataArray([1, 0, 0]))
+    testing.assert_equal(reducers.any_(x, **kwargs), xr.DataArray([1, 1, 0]))
+    testing.assert_equal(reducers.count_(x, **kwargs), xr.DataArray([2, 1, 0]))
+
+class TestPositionalReducers(unittest.TestCase):
+
+  def test_float_with_nulls(self):
+    x = xr.DataArray([[o, 1, 2], [3, o, 4], [o, o, o]])
+    kwargs = {"track_types": False, "dim": "dim_1"}
+    testing.assert_equal(reducers.first_(x, **kwargs), xr.DataArray([1, 3, o]))
+    testing.assert_equal(reducers.last_(x, **kwargs), xr.DataArray([2, 4, o]))
+
+class TestReducerWrapping(unittest.TestCase):
+
+  def test_empty_dimension(self):
+    x = xr.DataArray(np.ones((0, 2)))
+    for reducer in [reducers.mean_, reducers.sum_, reducers.max_,
+                    reducers.all_, reducers.first_, reducers.last_]:
+      f = reducer(x, track_types = False, dim = "dim_0")
+      testing.assert_equal(f, xr.DataArray([o, o], dims = ("dim_1",)))
+    # An empty set contains zero observations rather than a null count.
+    f = reducers.n_(x, track_types = False, dim = "dim_0")
+    testing.assert_equal(f, xr.DataArray([0, 0], dims = ("dim_1",)))
+
+  def test_keeps_coords(self):
+    x = xr.DataArray(
+      [[1, 2], [3, 4]],
+      coords = {"foo": ["a", "b"], "bar": [0, 1]}
+    )
+    f = reducers.sum_(x, track_types = False, dim = "bar")
+    testing.assert_equal(f, xr.DataArray([3, 7], coords = {"foo": ["a", "b"]}))
+
+  def test_drops_multidimensional_coords(self):
+    x = xr.DataArray(
+      np.ones((2, 2)),
+      dims = ("foo", "bar"),
+      coords = {"baz": (("foo", "bar"), [[1, 2], [3, 4]])}
+    )
+    f = reducers.sum_(x, track_types = False, dim = "bar")
+    self.assertNotIn("baz", f.coords)
+
+  def test_rolling_input(self):
+    x = xr.DataArray([1.0, 2.0, 3.0, 4.0], dims = ("time",))
+    obj = x.rolling({"time": 3}, center = True, min_periods = 2)
+    f = reducers.mean_(obj, track_types = False)
+    testing.assert_equal(f, xr.DataArray([1.5, 2, 3, 3.5], dims = ("time",)))
+
+if __name__ == "__main__":
+  unittest.main()